@@ -2,7 +2,8 @@
 Contains a default client that should work with most basic use cases
 """
 
-from typing import List
+import time
+from typing import List, Optional
 from fl_models.abstract.abstract_usecase import FederatedLearningUsecase
 
 import flwr as fl
@@ -11,6 +12,8 @@ import numpy as np
 from fl_models.util.metrics import rmse, correlation_coefficient
 from fl_models.util.dynamic_loader import load_usecase
 
+from fl_client.util.batch_size_tuner import BatchSizeTuner
+
 
 class BasicClient(fl.client.NumPyClient):
     """
@@ -25,6 +28,7 @@ class BasicClient(fl.client.NumPyClient):
         n_epochs: int,
         usecase_name: str = None,
         learning_rate: float = None,
+        batch_size_tuner: BatchSizeTuner = None,
         **kwargs
     ):
         """
@@ -35,24 +39,30 @@ class BasicClient(fl.client.NumPyClient):
         :param usecase_name: Name of the usecase selected by the server.
         :param learning_rate: (Optional) Learning rate used for training. If not given uses the \
             model's default
+        :param batch_size_tuner: (Optional) Selects the batch size for this host in the first \
+            training round. If not given uses the model's default
         :param kwargs: Arguments needed to initialize the usecase
         """
         assert usecase_name is not None, "Client is missing server usecase name!"
 
         self.client_id: int = client_id
         self.n_epochs: int = n_epochs
+        self.usecase_name: str = usecase_name
+        self.batch_size_tuner: Optional[BatchSizeTuner] = batch_size_tuner
+        self.batch_size: Optional[int] = None
 
         self.usecase: FederatedLearningUsecase = load_usecase(
             usecase_name,
             model_name=usecase_name + "_client_" + str(client_id),
             log_mlflow=False,
             learning_rate=learning_rate,
-            **kwargs
+            **kwargs,
         )
 
         self.metric_functions = [rmse, correlation_coefficient]
 
         self.current_train_rnd = 0
+        self.round_durations: List[float] = []
 
     def get_parameters(self) -> List[np.ndarray]:
         """
@@ -71,15 +81,33 @@ class BasicClient(fl.client.NumPyClient):
             (model_parameter, number of training data and Dict[trainings_loss]
         """
 
+        training_data = self.usecase.get_data(flat=True)
+        training_labels = self.usecase.get_labels(flat=True)
+
+        # The search runs on a copy of the model and leaves its weights and optimizer untouched
+        if self.batch_size_tuner is not None and self.current_train_rnd == 0:
+            self.batch_size = self.batch_size_tuner.get_batch_size(
+                self.usecase_name,
+                self.usecase.get_model(),
+                training_data,
+                training_labels,
+            )
+
+        round_start = time.perf_counter()
         self.usecase.get_model().set_weights(new_weights=parameters)
 
+        train_kwargs = (
+            {} if self.batch_size is None else {"batch_size": self.batch_size}
+        )
+
         history = None
 
         history = self.usecase.get_model().train(
-            training_data=self.usecase.get_data(flat=True),
-            training_labels=self.usecase.get_labels(flat=True),
+            training_data=training_data,
+            training_labels=training_labels,
             epochs=self.n_epochs,
             validation_data=None,
+            **train_kwargs,
         )
 
         assert (
@@ -87,6 +115,7 @@ class BasicClient(fl.client.NumPyClient):
         ), "No training samples were generated! Could not fit model!"
 
         self.current_train_rnd += 1
+        self.round_durations.append(time.perf_counter() - round_start)
         return (
             self.usecase.get_model().get_weights(),
             self.usecase.get_number_of_samples(),
@@ -106,6 +135,13 @@ class BasicClient(fl.client.NumPyClient):
 
         return eval_result[0], self.usecase.get_number_of_samples(), eval_result[1]
 
+    def close(self):
+        """
+        Releases the usecase and its model so they can be garbage collected once the session \
+        has finished. The client must not be used afterwards.
+        """
+        self.usecase = None
+
 
 def load_class():
     """Getter for Dynamic Loading of this class
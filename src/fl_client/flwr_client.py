@@ -6,7 +6,9 @@ import time
 import argparse
 
 import flwr as fl
+from fl_client.util.batch_size_tuner import BatchSizeTuner
 from fl_client.util.client_loader import load_client
+from fl_client.util.session_monitor import SessionMonitor
 
 
 # pylint: disable= too-many-arguments
@@ -18,6 +20,8 @@ def start_client(
     flwr_server_address: str = "localhost:8080",
     usecase_name=None,
     usecase_params: dict = None,
+    session_monitor: SessionMonitor = None,
+    batch_size_tuner: BatchSizeTuner = None,
 ):
     """
     Starts a client with specified data to participate in federated training
@@ -28,24 +32,41 @@ def start_client(
     :param flwr_server_address: The address under which the server is hosted
     :param usecase_name: Name of the usecase that was selected by the server
     :param usecase_params: Parameters used to instantiate the usecase
+    :param session_monitor: (Optional) Monitor shared between consecutive sessions of a long \
+        running process. Tears down the client after training and records its resource usage
+    :param batch_size_tuner: (Optional) Selects the training batch size for this host. If not \
+        given the model's default batch size is used
     """
 
     if usecase_params is None:
         usecase_params = {}
 
-    print(f"CREATING NUMPY_CLIENT {client_id}")
+    if session_monitor is None:
+        session_monitor = SessionMonitor()
 
-    numpy_client = load_client(
-        client_name,
-        usecase_name=usecase_name,
-        client_id=client_id,
-        n_epochs=n_client_epochs,
-        learning_rate=learning_rate,
-        **usecase_params,
-    )
+    print(f"CREATING NUMPY_CLIENT {client_id}")
 
-    time.sleep(5)
-    fl.client.start_numpy_client(flwr_server_address, client=numpy_client)
+    session_monitor.start_session()
+    numpy_client = None
+    try:
+        numpy_client = load_client(
+            client_name,
+            usecase_name=usecase_name,
+            client_id=client_id,
+            n_epochs=n_client_epochs,
+            learning_rate=learning_rate,
+            batch_size_tuner=batch_size_tuner,
+            **usecase_params,
+        )
+
+        time.sleep(5)
+        fl.client.start_numpy_client(flwr_server_address, client=numpy_client)
+    finally:
+        # A failing teardown must not hide the error of the training session
+        try:
+            session_monitor.end_session(numpy_client)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Could not tear down session of client {client_id}: {error}")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,8 @@ import os
 import socketio
 from dynaconf import Dynaconf
 from fl_client.flwr_client import start_client
+from fl_client.util.batch_size_tuner import BatchSizeTuner
+from fl_client.util.session_monitor import SessionMonitor
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.yaml")
 CONFIG = Dynaconf(includes=[CONFIG_FILE])
@@ -22,6 +24,24 @@ else:
     LOG_SOCKET_IO = False
 sio = socketio.Client(logger=LOG_SOCKET_IO, engineio_logger=LOG_SOCKET_IO)
 
+# Shared between all training sessions of this process to detect resource growth across sessions
+SESSION_MONITOR = SessionMonitor(
+    window=CONFIG["session_monitor"]["window"],
+    growth_tolerance=CONFIG["session_monitor"]["growth_tolerance"],
+)
+
+BATCH_SIZE_TUNER = (
+    BatchSizeTuner(
+        cache_file=CONFIG["batch_size_tuning"]["cache_file"],
+        candidates=CONFIG["batch_size_tuning"]["candidates"],
+        sample_batches=CONFIG["batch_size_tuning"]["sample_batches"],
+        memory_limit_mb=CONFIG["batch_size_tuning"]["memory_limit_mb"],
+        host_id=CONFIG["batch_size_tuning"]["host_id"],
+    )
+    if CONFIG["batch_size_tuning"]["enabled"]
+    else None
+)
+
 
 @sio.event
 def connect():
@@ -60,6 +80,8 @@ def start_train(data):
     * usecase
     * num_client_train_epochs
     * learning_rate
+    * session_monitor
+    * batch_size_tuning
 
     :param data: Dictionary containing data emitted from the server. Uses the following keys:
         * client_id
@@ -87,6 +109,8 @@ def start_train(data):
         flwr_server_address=flwr_server_address,
         usecase_name=usecase_name,
         usecase_params={**config_usecase_params, **broadcast_params},
+        session_monitor=SESSION_MONITOR,
+        batch_size_tuner=BATCH_SIZE_TUNER,
     )
 
 
@@ -0,0 +1,258 @@
+"""
+Selects the training batch size with the best throughput on the local hardware.
+
+The search times a short training run for each candidate batch size on a sample of the local data.
+It runs on a throwaway copy of the keras model, so neither the weights nor the optimizer state of
+the federated model are touched. The result is persisted per host and usecase so later sessions
+can skip the search.
+"""
+import inspect
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from fl_client.util.session_monitor import get_peak_rss_bytes
+
+
+def accepts_batch_size(model) -> bool:
+    """
+    Checks whether the train function of a usecase model accepts a batch_size argument.
+    :param model: Model of the usecase providing a train function
+    :return: True if batch_size can be passed to model.train
+    """
+    try:
+        parameters = inspect.signature(model.train).parameters.values()
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return any(
+        parameter.name == "batch_size" or parameter.kind == parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
+
+
+def _find_keras_model(model):
+    """
+    :param model: Model of the usecase, either a keras model or a wrapper holding it as `model`
+    :return: The compiled keras model or None if it can not be found
+    """
+    # pylint: disable=import-outside-toplevel
+    import tensorflow as tf
+
+    for candidate in (model, getattr(model, "model", None)):
+        if isinstance(candidate, tf.keras.Model) and candidate.optimizer is not None:
+            return candidate
+    return None
+
+
+def _throwaway_copy(keras_model):
+    """
+    :param keras_model: Compiled keras model
+    :return: A compiled copy with the same weights and a fresh optimizer of the same configuration
+    """
+    # pylint: disable=import-outside-toplevel
+    import tensorflow as tf
+
+    copy = tf.keras.models.clone_model(keras_model)
+    copy.set_weights(keras_model.get_weights())
+    copy.compile(
+        optimizer=tf.keras.optimizers.deserialize(
+            tf.keras.optimizers.serialize(keras_model.optimizer)
+        ),
+        loss=keras_model.loss,
+    )
+    return copy
+
+
+def _out_of_memory_errors() -> tuple:
+    """
+    :return: Exception types raised if a batch does not fit into memory
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import tensorflow as tf
+    except ImportError:
+        return (MemoryError,)
+    return (MemoryError, tf.errors.ResourceExhaustedError)
+
+
+class BatchSizeTuner:
+    """
+    Times candidate batch sizes on a data sample and picks the one with the best throughput \
+    within the memory limit. Choices are cached in a json file keyed by host id and usecase.
+    """
+
+    # pylint: disable= too-many-arguments
+    def __init__(
+        self,
+        cache_file: str,
+        candidates: List[int] = None,
+        sample_batches: int = 4,
+        memory_limit_mb: Optional[int] = None,
+        host_id: Optional[str] = None,
+    ):
+        """
+        Initializes a BatchSizeTuner.
+
+        :param cache_file: Path of the json file the chosen batch sizes are persisted in. Must be \
+            on a mounted volume when running in a container to survive container recreation
+        :param candidates: Batch sizes that are timed. Defaults to powers of two from 16 to 512
+        :param sample_batches: Number of batches of the largest candidate used as data sample
+        :param memory_limit_mb: (Optional) Maximum peak resident set size of the process in MiB. \
+            Candidates raising the peak above the limit are discarded
+        :param host_id: (Optional) Stable identifier of the host used in the cache key. Defaults \
+            to the host name, which is the container id in docker deployments
+        """
+        self.cache_file: str = os.path.expanduser(cache_file)
+        self.candidates: List[int] = sorted(
+            candidates if candidates else [16, 32, 64, 128, 256, 512]
+        )
+        self.sample_batches: int = sample_batches
+        self.memory_limit: Optional[int] = (
+            memory_limit_mb * 2 ** 20 if memory_limit_mb is not None else None
+        )
+        self.host_id: str = host_id if host_id else socket.gethostname()
+
+    def cache_key(self, usecase_name: str) -> str:
+        """
+        :param usecase_name: Name of the usecase the batch size is tuned for
+        :return: Key of the batch size of the usecase on this host in the cache file
+        """
+        return f"{self.host_id}/{usecase_name}"
+
+    def _load_cache(self) -> Optional[Dict[str, dict]]:
+        """
+        :return: Content of the cache file or None if it exists but can not be read
+        """
+        if not os.path.isfile(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as cache:
+                return json.load(cache)
+        except (OSError, ValueError) as error:
+            print(f"Could not read batch size cache {self.cache_file}: {error}")
+            return None
+
+    def _store(self, key: str, batch_size: Optional[int], throughput: Optional[float]):
+        cache = self._load_cache()
+        if cache is None:
+            print(f"Not overwriting unreadable batch size cache {self.cache_file}")
+            return
+        cache[key] = {"batch_size": batch_size, "samples_per_second": throughput}
+
+        cache_dir = os.path.dirname(self.cache_file) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see a partially written cache
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as cache_out:
+                json.dump(cache, cache_out, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get_batch_size(self, usecase_name: str, model, data, labels) -> Optional[int]:
+        """
+        Returns the cached batch size for the usecase on this host or searches for it.
+        :param usecase_name: Name of the usecase the batch size is tuned for
+        :param model: Model of the usecase providing a train function
+        :param data: Flat training data
+        :param labels: Flat training labels
+        :return: The batch size with the best throughput or None if the usecase default should \
+            be used
+        """
+        if not accepts_batch_size(model):
+            print("The usecase model does not accept a batch size, skipping the search")
+            return None
+
+        key = self.cache_key(usecase_name)
+        cached = (self._load_cache() or {}).get(key)
+        if cached is not None:
+            print(f"USING CACHED BATCH SIZE {cached['batch_size']} FOR {key}")
+            return cached["batch_size"]
+
+        throughputs = {}
+        try:
+            keras_model = _find_keras_model(model)
+            if keras_model is not None:
+                throughputs = self._time_candidates(keras_model, data, labels)
+        except Exception as error:  # pylint: disable=broad-except
+            # Tuning is optional, the round is trained with the usecase default instead
+            print(
+                f"Batch size search for {key} failed, using the usecase default: {error}"
+            )
+            return None
+
+        if keras_model is None:
+            # Persisted as the model of the usecase can never be tuned
+            print(f"Could not find the keras model of {key}, using the usecase default")
+            self._store(key, None, None)
+            return None
+
+        if not throughputs:
+            print(f"No batch size could be timed for {key}, using the usecase default")
+            return None
+
+        batch_size = max(throughputs, key=throughputs.get)
+        print(
+            f"SELECTED BATCH SIZE {batch_size} FOR {key} "
+            f"({throughputs[batch_size]:.1f} samples/s)"
+        )
+        self._store(key, batch_size, throughputs[batch_size])
+        return batch_size
+
+    def _train_within_memory(self, model, sample, batch_size: int) -> Optional[float]:
+        """
+        Trains the model one epoch on the sample.
+        :return: Training duration in seconds or None if the batch does not fit into memory or \
+            raised the peak memory above the limit
+        """
+        peak_before = get_peak_rss_bytes()
+        start = time.perf_counter()
+        try:
+            model.fit(*sample, batch_size=batch_size, epochs=1, verbose=0)
+        except _out_of_memory_errors():
+            print(f"Batch size {batch_size} does not fit into memory")
+            return None
+        elapsed = time.perf_counter() - start
+
+        peak_after = get_peak_rss_bytes()
+        if (
+            self.memory_limit is not None
+            and peak_after is not None
+            and peak_after > peak_before
+            and peak_after > self.memory_limit
+        ):
+            print(f"Batch size {batch_size} exceeds the memory limit")
+            return None
+        return elapsed
+
+    def _time_candidates(self, keras_model, data, labels) -> Dict[int, float]:
+        """
+        Trains one epoch on a data sample for every candidate batch size using a throwaway copy \
+        of the keras model. Stops at the first candidate exceeding the memory limit as larger \
+        batches need even more memory.
+        :return: Throughput in samples per second for each successfully timed batch size
+        """
+        n_samples = min(len(data), self.candidates[-1] * self.sample_batches)
+        sample = (data[:n_samples], labels[:n_samples])
+        candidates = [size for size in self.candidates if size <= n_samples]
+        if not candidates:
+            return {}
+
+        copy = _throwaway_copy(keras_model)
+        # Untimed warm-up to exclude graph tracing from the first measurement. It raises the
+        # peak memory for the smallest candidate, so the limit is checked here for it
+        if self._train_within_memory(copy, sample, candidates[0]) is None:
+            return {}
+
+        throughputs = {}
+        for batch_size in candidates:
+            elapsed = self._train_within_memory(copy, sample, batch_size)
+            if elapsed is None:
+                break
+            throughputs[batch_size] = n_samples / elapsed
+        return throughputs
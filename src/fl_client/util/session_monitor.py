@@ -0,0 +1,203 @@
+"""
+Lifecycle management and resource instrumentation for consecutive client sessions.
+
+A long running KOSMoS client starts a new flower client (including usecase and model) for every
+training request of the server. The SessionMonitor tears down the state of a finished session and
+records resource usage per session to detect memory or latency growth across sessions.
+"""
+import gc
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class SessionRecord:
+    """
+    Resource usage recorded for a single finished session.
+    """
+
+    session_index: int
+    duration: float
+    rss_bytes: Optional[int]
+    rss_is_peak: bool
+    object_count: int
+    round_durations: List[float] = field(default_factory=list)
+
+    @property
+    def mean_round_duration(self) -> Optional[float]:
+        """
+        :return: Mean duration of the training rounds in seconds or None if no round was recorded
+        """
+        if not self.round_durations:
+            return None
+        return sum(self.round_durations) / len(self.round_durations)
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """
+    Returns the peak resident set size this process reached since it was started.
+    :return: Peak resident set size in bytes or None if not available (e.g. on windows)
+    """
+    try:
+        # resource is only available on unix
+        # pylint: disable=import-outside-toplevel
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on linux
+    if sys.platform == "darwin":
+        return peak_rss
+    return peak_rss * 1024
+
+
+def get_current_rss_bytes() -> Optional[int]:
+    """
+    Returns the current resident set size of this process.
+    :return: Resident set size in bytes or None if /proc is not available (e.g. on macOS)
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def clear_backend_session():
+    """
+    Clears the global keras state (graphs, layer name counters, ...) of the tensorflow backend.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import tensorflow as tf
+    except ImportError:
+        return
+    tf.keras.backend.clear_session()
+
+
+def teardown_client(client):
+    """
+    Releases the usecase and model state held by a client and clears the backend session.
+    :param client: The client of the finished session. Clients may implement a close() method to \
+        release their resources
+    """
+    if client is not None and hasattr(client, "close"):
+        client.close()
+    clear_backend_session()
+    gc.collect()
+
+
+class SessionMonitor:
+    """
+    Tears down client state between sessions and records RSS, the number of tracked python \
+    objects and the per round latency of every session. Growth trends are reported after each \
+    session.
+    """
+
+    def __init__(self, window: int = 3, growth_tolerance: float = 0.1):
+        """
+        Initializes a SessionMonitor.
+
+        :param window: Number of consecutive sessions that are compared to detect a growth trend
+        :param growth_tolerance: Relative growth over the window which is tolerated before a \
+            trend is flagged
+        """
+        assert window >= 2, "At least two sessions are needed to detect growth!"
+
+        self.window: int = window
+        self.growth_tolerance: float = growth_tolerance
+        self.sessions: List[SessionRecord] = []
+        self._session_start: Optional[float] = None
+
+    def start_session(self):
+        """
+        Marks the start of a new session.
+        """
+        self._session_start = time.perf_counter()
+
+    def end_session(self, client) -> SessionRecord:
+        """
+        Tears down the client of the finished session and records its resource usage.
+        :param client: Flower client of the finished session, may be None if the client creation \
+            failed
+        :return: The record of the finished session
+        """
+        duration = (
+            time.perf_counter() - self._session_start
+            if self._session_start is not None
+            else 0.0
+        )
+        self._session_start = None
+        round_durations = list(getattr(client, "round_durations", []))
+
+        teardown_client(client)
+
+        # Without /proc only the peak RSS is available, which never decreases
+        rss_bytes = get_current_rss_bytes()
+        record = SessionRecord(
+            session_index=len(self.sessions),
+            duration=duration,
+            rss_bytes=rss_bytes if rss_bytes is not None else get_peak_rss_bytes(),
+            rss_is_peak=rss_bytes is None,
+            object_count=len(gc.get_objects()),
+            round_durations=round_durations,
+        )
+        self.sessions.append(record)
+
+        mean_round_duration = record.mean_round_duration
+        print(
+            f"SESSION {record.session_index} FINISHED: "
+            f"duration={record.duration:.2f}s, "
+            f"{'peak_rss' if record.rss_is_peak else 'rss'}="
+            + (
+                f"{record.rss_bytes / 2 ** 20:.1f}MiB, "
+                if record.rss_bytes is not None
+                else "n/a, "
+            )
+            + f"objects={record.object_count}, mean_round_duration="
+            + (
+                f"{mean_round_duration:.2f}s"
+                if mean_round_duration is not None
+                else "n/a"
+            )
+        )
+        for warning in self.detect_growth():
+            print(f"WARNING: {warning}")
+
+        return record
+
+    def detect_growth(self) -> List[str]:
+        """
+        Checks the last sessions for steadily growing resource usage. A metric is flagged if it \
+        did not decrease between any two of the last window sessions and grew by more than the \
+        growth tolerance overall. The RSS is skipped if only the peak RSS was recorded as it \
+        never decreases.
+        :return: A description for every metric with a growth trend
+        """
+        if len(self.sessions) < self.window:
+            return []
+
+        recent = self.sessions[-self.window :]
+        metrics = {
+            "RSS": [
+                None if record.rss_is_peak else record.rss_bytes for record in recent
+            ],
+            "Object count": [record.object_count for record in recent],
+            "Mean round latency": [record.mean_round_duration for record in recent],
+        }
+
+        warnings = []
+        for name, values in metrics.items():
+            if any(value is None for value in values) or values[0] <= 0:
+                continue
+            steady = all(prev <= curr for prev, curr in zip(values, values[1:]))
+            growth = (values[-1] - values[0]) / values[0]
+            if steady and growth > self.growth_tolerance:
+                warnings.append(
+                    f"{name} grew by {growth:.1%} over the last {self.window} sessions"
+                )
+        return warnings
@@ -6,5 +6,102 @@
     - https://docs.pytest.org/en/stable/fixture.html
     - https://docs.pytest.org/en/stable/writing_plugins.html
 """
+import importlib
+import sys
+import types
 
-# import pytest
+import pytest
+
+
+class StubModel:
+    """Usecase model recording the arguments of its train calls"""
+
+    def __init__(self):
+        self.weights = [0.0]
+        self.train_calls = []
+
+    def get_weights(self):
+        """Returns the current weights"""
+        return self.weights
+
+    def set_weights(self, new_weights):
+        """Replaces the weights"""
+        self.weights = new_weights
+
+    def train(self, training_data, training_labels, epochs, validation_data, **kwargs):
+        """Records the call and returns a keras like history"""
+        self.train_calls.append(
+            {
+                "training_data": training_data,
+                "training_labels": training_labels,
+                "epochs": epochs,
+                "validation_data": validation_data,
+                **kwargs,
+            }
+        )
+        return types.SimpleNamespace(history={"loss": [0.5]})
+
+
+class StubUsecase:
+    """Usecase holding a stub model and a fixed number of samples"""
+
+    def __init__(self, n_samples=8, **kwargs):
+        self.kwargs = kwargs
+        self.model = StubModel()
+        self.data = [[float(index)] for index in range(n_samples)]
+        self.labels = [float(index) for index in range(n_samples)]
+
+    def get_model(self):
+        """Returns the stub model"""
+        return self.model
+
+    def get_data(self, flat):
+        """Returns the flat data"""
+        assert flat
+        return self.data
+
+    def get_labels(self, flat):
+        """Returns the flat labels"""
+        assert flat
+        return self.labels
+
+    def get_number_of_samples(self):
+        """Returns the number of samples"""
+        return len(self.data)
+
+    def eval_fn(self, parameters):  # pylint: disable=unused-argument
+        """Returns a fixed loss and metrics"""
+        return 0.25, {"rmse": 0.25}
+
+
+@pytest.fixture(name="basic_client_module")
+def fixture_basic_client_module(monkeypatch):
+    """
+    Imports the basic client module with flwr and fl_models replaced by stubs, so the client \
+    can be tested without the training stack.
+    """
+    flwr = types.ModuleType("flwr")
+    flwr.client = types.SimpleNamespace(NumPyClient=object)
+
+    modules = {
+        "flwr": flwr,
+        "fl_models": types.ModuleType("fl_models"),
+        "fl_models.abstract": types.ModuleType("fl_models.abstract"),
+        "fl_models.abstract.abstract_usecase": types.SimpleNamespace(
+            FederatedLearningUsecase=StubUsecase
+        ),
+        "fl_models.util": types.ModuleType("fl_models.util"),
+        "fl_models.util.metrics": types.SimpleNamespace(
+            rmse=None, correlation_coefficient=None
+        ),
+        "fl_models.util.dynamic_loader": types.SimpleNamespace(
+            load_usecase=lambda usecase_name, **kwargs: StubUsecase(**kwargs)
+        ),
+    }
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "fl_client.clients.basic_client", raising=False)
+
+    yield importlib.import_module("fl_client.clients.basic_client")
+
+    sys.modules.pop("fl_client.clients.basic_client", None)
@@ -0,0 +1,74 @@
+"""
+Tests for the basic client using a stub usecase
+"""
+# pylint: disable=too-few-public-methods
+
+
+class _Tuner:
+    """Batch size tuner stub returning a fixed batch size"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.calls = 0
+
+    def get_batch_size(self, usecase_name, model, data, labels):
+        """Returns the fixed batch size"""
+        assert usecase_name == "BearingUseCase"
+        assert model.train_calls == []
+        assert len(data) == len(labels)
+        self.calls += 1
+        return self.batch_size
+
+
+def _client(basic_client_module, tuner=None):
+    return basic_client_module.BasicClient(
+        client_id=0, n_epochs=2, usecase_name="BearingUseCase", batch_size_tuner=tuner
+    )
+
+
+def test_fit_passes_tuned_batch_size(basic_client_module):
+    """The batch size selected in the first round is used in every round"""
+    tuner = _Tuner(batch_size=32)
+    client = _client(basic_client_module, tuner)
+
+    client.fit([1.0], {})
+    client.fit([2.0], {})
+
+    train_calls = client.usecase.get_model().train_calls
+    assert [call["batch_size"] for call in train_calls] == [32, 32]
+    assert [call["epochs"] for call in train_calls] == [2, 2]
+    assert tuner.calls == 1
+
+
+def test_fit_uses_usecase_default_without_batch_size(basic_client_module):
+    """No batch size is passed if the tuner falls back to the usecase default"""
+    client = _client(basic_client_module, _Tuner(batch_size=None))
+
+    weights, n_samples, metrics = client.fit([1.0], {})
+
+    train_call = client.usecase.get_model().train_calls[0]
+    assert "batch_size" not in train_call
+    assert weights == [1.0]
+    assert n_samples == 8
+    assert metrics == {"loss": 0.5}
+
+
+def test_fit_without_tuner(basic_client_module):
+    """Without tuner the model is trained with its default batch size"""
+    client = _client(basic_client_module)
+
+    client.fit([1.0], {})
+
+    assert "batch_size" not in client.usecase.get_model().train_calls[0]
+    assert len(client.round_durations) == 1
+
+
+def test_fit_and_evaluate_report_the_same_partition(basic_client_module):
+    """Training and evaluation weights refer to the same usecase samples"""
+    client = _client(basic_client_module)
+
+    _, n_fit_samples, _ = client.fit([1.0], {})
+    loss, n_eval_samples, metrics = client.evaluate([1.0], {})
+
+    assert n_fit_samples == n_eval_samples == client.usecase.get_number_of_samples()
+    assert (loss, metrics) == client.usecase.eval_fn([1.0])
@@ -0,0 +1,264 @@
+"""
+Tests for the batch size tuner search, cache and model checks
+"""
+import json
+
+import pytest
+
+from fl_client.util import batch_size_tuner
+from fl_client.util.batch_size_tuner import BatchSizeTuner, accepts_batch_size
+
+
+# pylint: disable=too-few-public-methods
+class _Model:
+    """Usecase model stub whose train function accepts a batch size"""
+
+    def train(
+        self, training_data, training_labels, epochs, validation_data, batch_size=None
+    ):
+        """Does not train"""
+
+
+# pylint: disable=too-few-public-methods
+class _ModelWithoutBatchSize:
+    """Usecase model stub whose train function does not accept a batch size"""
+
+    def train(self, training_data, training_labels, epochs, validation_data):
+        """Does not train"""
+
+
+# pylint: disable=too-few-public-methods
+class _KerasModel:
+    """Keras model stub recording the batch sizes it was fitted with"""
+
+    def __init__(self, out_of_memory_from=None):
+        self.batch_sizes = []
+        self.out_of_memory_from = out_of_memory_from
+
+    def fit(self, data, labels, batch_size, epochs, verbose):
+        """Records the batch size or raises if it does not fit into memory"""
+        assert len(data) == len(labels) and epochs == 1 and verbose == 0
+        if (
+            self.out_of_memory_from is not None
+            and batch_size >= self.out_of_memory_from
+        ):
+            raise MemoryError()
+        self.batch_sizes.append(batch_size)
+
+
+@pytest.fixture(name="tuner")
+def fixture_tuner(tmp_path):
+    """Tuner with a fixed host id writing into a temporary cache file"""
+    return BatchSizeTuner(cache_file=str(tmp_path / "cache.json"), host_id="gateway")
+
+
+@pytest.fixture(name="keras_model")
+def fixture_keras_model(monkeypatch):
+    """Keras model stub used by the search instead of tensorflow"""
+    keras_model = _KerasModel()
+    monkeypatch.setattr(batch_size_tuner, "_find_keras_model", lambda model: model)
+    monkeypatch.setattr(batch_size_tuner, "_throwaway_copy", lambda model: model)
+    return keras_model
+
+
+def _count_searches(tuner, monkeypatch, throughputs):
+    calls = []
+
+    def _time_candidates(model, data, labels):
+        calls.append((model, data, labels))
+        return throughputs
+
+    monkeypatch.setattr(batch_size_tuner, "_find_keras_model", lambda model: model)
+    monkeypatch.setattr(tuner, "_time_candidates", _time_candidates)
+    return calls
+
+
+def _peak_rss(monkeypatch, values):
+    values = iter(values)
+    monkeypatch.setattr(batch_size_tuner, "get_peak_rss_bytes", lambda: next(values))
+
+
+def _cached(tuner):
+    with open(tuner.cache_file, "r", encoding="utf-8") as cache:
+        return json.load(cache)
+
+
+def test_accepts_batch_size():
+    """Only train functions with a batch_size or **kwargs argument are tuned"""
+
+    # pylint: disable=too-few-public-methods
+    class _ModelWithKwargs:
+        def train(self, **kwargs):
+            """Does not train"""
+
+    assert accepts_batch_size(_Model())
+    assert accepts_batch_size(_ModelWithKwargs())
+    assert not accepts_batch_size(_ModelWithoutBatchSize())
+    assert not accepts_batch_size(object())
+
+
+def test_search_result_is_cached(tuner, monkeypatch):
+    """The fastest batch size is persisted and reused without a second search"""
+    calls = _count_searches(tuner, monkeypatch, {16: 10.0, 32: 30.0, 64: 20.0})
+
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) == 32
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) == 32
+    assert len(calls) == 1
+    assert _cached(tuner)["gateway/BearingUseCase"]["batch_size"] == 32
+
+
+def test_cache_is_keyed_by_host_and_usecase(tuner, monkeypatch):
+    """Another usecase or host triggers a new search"""
+    calls = _count_searches(tuner, monkeypatch, {16: 10.0})
+    other_host = BatchSizeTuner(cache_file=tuner.cache_file, host_id="server")
+    other_calls = _count_searches(other_host, monkeypatch, {64: 10.0})
+
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) == 16
+    assert tuner.get_batch_size("TurbofanUseCase", _Model(), [], []) == 16
+    assert other_host.get_batch_size("BearingUseCase", _Model(), [], []) == 64
+    assert len(calls) == 2
+    assert len(other_calls) == 1
+
+
+def test_search_without_result_is_not_cached(tuner, monkeypatch):
+    """A search failing because of the data is repeated in later sessions"""
+    calls = _count_searches(tuner, monkeypatch, {})
+
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) is None
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) is None
+    assert len(calls) == 2
+
+
+def test_missing_keras_model_is_cached(tuner, monkeypatch):
+    """A usecase model that can never be tuned is not searched again"""
+    monkeypatch.setattr(batch_size_tuner, "_find_keras_model", lambda model: None)
+
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) is None
+    assert _cached(tuner)["gateway/BearingUseCase"]["batch_size"] is None
+
+
+def test_search_error_falls_back_to_default(tuner, keras_model, monkeypatch):
+    """Errors of the search do not reach the training round and are not cached"""
+
+    def _clone_error(model):
+        raise ValueError("subclassed model")
+
+    monkeypatch.setattr(batch_size_tuner, "_throwaway_copy", _clone_error)
+
+    assert (
+        tuner.get_batch_size("BearingUseCase", keras_model, [0] * 64, [0] * 64) is None
+    )
+    assert not keras_model.batch_sizes
+    with pytest.raises(FileNotFoundError):
+        _cached(tuner)
+
+
+def test_model_without_batch_size_is_not_tuned(tuner, monkeypatch):
+    """Models not accepting a batch size keep their default without a search"""
+    calls = _count_searches(tuner, monkeypatch, {16: 10.0})
+
+    assert (
+        tuner.get_batch_size("BearingUseCase", _ModelWithoutBatchSize(), [], []) is None
+    )
+    assert not calls
+
+
+def test_unreadable_cache_is_not_overwritten(tuner, monkeypatch):
+    """A corrupt cache file is left untouched instead of being replaced"""
+    _count_searches(tuner, monkeypatch, {16: 10.0})
+    with open(tuner.cache_file, "w", encoding="utf-8") as cache:
+        cache.write("{corrupt")
+
+    assert tuner.get_batch_size("BearingUseCase", _Model(), [], []) == 16
+
+    with open(tuner.cache_file, "r", encoding="utf-8") as cache:
+        assert cache.read() == "{corrupt"
+
+
+def test_candidates_are_limited_by_the_sample(tmp_path, keras_model):
+    """Only candidates fitting into the data sample are timed after a warm-up"""
+    tuner = BatchSizeTuner(
+        cache_file=str(tmp_path / "cache.json"),
+        candidates=[128, 16, 64, 32],
+        sample_batches=1,
+    )
+
+    throughputs = tuner._time_candidates(  # pylint: disable=protected-access
+        keras_model, [0] * 100, [0] * 100
+    )
+
+    assert keras_model.batch_sizes == [16, 16, 32, 64]
+    assert sorted(throughputs) == [16, 32, 64]
+
+
+def test_too_few_samples_time_no_candidate(tuner, keras_model):
+    """Without enough samples for the smallest candidate nothing is trained"""
+    throughputs = tuner._time_candidates(  # pylint: disable=protected-access
+        keras_model, [0] * 8, [0] * 8
+    )
+
+    assert not throughputs
+    assert not keras_model.batch_sizes
+
+
+def test_search_stops_at_out_of_memory(tmp_path, monkeypatch):
+    """Larger candidates are not tried once a batch does not fit into memory"""
+    keras_model = _KerasModel(out_of_memory_from=64)
+    monkeypatch.setattr(batch_size_tuner, "_throwaway_copy", lambda model: model)
+    tuner = BatchSizeTuner(
+        cache_file=str(tmp_path / "cache.json"), candidates=[16, 32, 64, 128]
+    )
+
+    throughputs = tuner._time_candidates(  # pylint: disable=protected-access
+        keras_model, [0] * 512, [0] * 512
+    )
+
+    assert sorted(throughputs) == [16, 32]
+
+
+def test_search_stops_at_memory_limit(tmp_path, keras_model, monkeypatch):
+    """A candidate raising the peak memory above the limit ends the search"""
+    mib = 2 ** 20
+    # Peak before and after the warm-up and each timed candidate
+    _peak_rss(
+        monkeypatch,
+        [
+            10 * mib,
+            50 * mib,
+            50 * mib,
+            50 * mib,
+            50 * mib,
+            60 * mib,
+            60 * mib,
+            150 * mib,
+        ],
+    )
+    tuner = BatchSizeTuner(
+        cache_file=str(tmp_path / "cache.json"),
+        candidates=[16, 32, 64],
+        memory_limit_mb=100,
+    )
+
+    throughputs = tuner._time_candidates(  # pylint: disable=protected-access
+        keras_model, [0] * 256, [0] * 256
+    )
+
+    assert sorted(throughputs) == [16, 32]
+
+
+def test_memory_limit_applies_to_warm_up(tmp_path, keras_model, monkeypatch):
+    """The smallest candidate is rejected if its warm-up exceeds the limit"""
+    mib = 2 ** 20
+    _peak_rss(monkeypatch, [10 * mib, 150 * mib])
+    tuner = BatchSizeTuner(
+        cache_file=str(tmp_path / "cache.json"),
+        candidates=[16, 32],
+        memory_limit_mb=100,
+    )
+
+    throughputs = tuner._time_candidates(  # pylint: disable=protected-access
+        keras_model, [0] * 256, [0] * 256
+    )
+
+    assert not throughputs
+    assert keras_model.batch_sizes == [16]
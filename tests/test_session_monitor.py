@@ -0,0 +1,91 @@
+"""
+Tests for the session lifecycle monitor
+"""
+import pytest
+
+from fl_client.util.session_monitor import SessionMonitor, SessionRecord
+
+
+def _record(index, rss_bytes=100, object_count=100, round_durations=None):
+    return SessionRecord(
+        session_index=index,
+        duration=1.0,
+        rss_bytes=rss_bytes,
+        rss_is_peak=False,
+        object_count=object_count,
+        round_durations=[1.0] if round_durations is None else round_durations,
+    )
+
+
+def test_no_growth_detected_before_window_is_filled():
+    """Growth is only evaluated once window sessions were recorded"""
+    monitor = SessionMonitor(window=3)
+    monitor.sessions = [_record(0, rss_bytes=100), _record(1, rss_bytes=1000)]
+
+    assert not monitor.detect_growth()
+
+
+def test_steady_growth_is_flagged():
+    """Metrics growing steadily beyond the tolerance are reported"""
+    monitor = SessionMonitor(window=3, growth_tolerance=0.1)
+    monitor.sessions = [
+        _record(0, rss_bytes=100, object_count=100, round_durations=[1.0]),
+        _record(1, rss_bytes=110, object_count=100, round_durations=[1.5]),
+        _record(2, rss_bytes=130, object_count=105, round_durations=[2.0]),
+    ]
+
+    warnings = monitor.detect_growth()
+
+    assert len(warnings) == 2
+    assert warnings[0].startswith("RSS grew by 30.0%")
+    assert warnings[1].startswith("Mean round latency grew by 100.0%")
+
+
+def test_fluctuation_and_sessions_without_rounds_are_not_flagged():
+    """Decreasing values and sessions without rounds break a trend"""
+    monitor = SessionMonitor(window=3, growth_tolerance=0.1)
+    monitor.sessions = [
+        _record(0, rss_bytes=100, round_durations=[]),
+        _record(1, rss_bytes=200, round_durations=[1.0]),
+        _record(2, rss_bytes=150, round_durations=[3.0]),
+    ]
+
+    assert not monitor.detect_growth()
+
+
+def test_end_session_tears_down_client():
+    """Ending a session closes the client and records its round durations"""
+
+    # pylint: disable=too-few-public-methods
+    class _Client:
+        round_durations = [0.5, 1.5]
+        closed = False
+
+        def close(self):
+            """Marks the client as closed"""
+            self.closed = True
+
+    client = _Client()
+    monitor = SessionMonitor()
+    monitor.start_session()
+
+    record = monitor.end_session(client)
+
+    assert client.closed
+    assert record.session_index == 0
+    assert record.mean_round_duration == pytest.approx(1.0)
+    assert record.rss_bytes > 0
+    assert monitor.sessions == [record]
+
+
+def test_peak_rss_is_not_flagged():
+    """Peak RSS only grows and is therefore not used to detect growth"""
+    monitor = SessionMonitor(window=3, growth_tolerance=0.1)
+    monitor.sessions = [
+        _record(0, rss_bytes=100),
+        _record(1, rss_bytes=200),
+        _record(2, rss_bytes=300),
+    ]
+    monitor.sessions[0].rss_is_peak = True
+
+    assert not monitor.detect_growth()